@@ -0,0 +1,135 @@
+from sqlalchemy import event, select, insert, update, delete, func, inspect
+from extensoes import db, SessaoRoteada
+from modelos import Pedido, ItemPedido, Material, ItemReceita, Consumo
+
+# --- ESTOQUE DE MATERIAIS (Cordão, argolas...) ---
+# Reservado: o que os pedidos em aberto vão gastar. Não fica guardado, é calculado numa consulta
+# agrupada a partir dos itens e receitas de agora (assim mudar receita ou item nunca desanda a conta).
+# Consumido: quando o pedido sai (Enviado/Concluido/Entregue), o que ele gasta sai do estoque e fica
+# anotado em Consumos. Se o envio for desfeito, devolve exatamente o que foi anotado; se os itens de um
+# pedido que já saiu forem mudados, devolve o anotado e consome de novo com os itens novos.
+# Pedido apagado ou cancelado depois de enviado não devolve nada: o material já saiu do ateliê
+# (e se o cancelado for enviado de novo, não gasta outra vez).
+
+# O status é digitado na tela de edição: aceita "Concluido" com e sem acento
+# (o CSS das listas, status-concluido, é montado sem acento)
+STATUS_CONSUMIDO = ('Enviado', 'Concluido', 'Concluído', 'Entregue')
+STATUS_CANCELADO = ('Cancelado',)
+
+materiais = Material.__table__
+receitas = ItemReceita.__table__
+itens = ItemPedido.__table__
+pedidos = Pedido.__table__
+consumos = Consumo.__table__
+
+def consumir(conexao, pedido_ids):
+    # Pedido que já tem Consumos já gastou o material (ex.: enviado, cancelado e enviado de novo): não gasta outra vez
+    ja_consumidos = set(conexao.execute(select(consumos.c.pedido_id).where(consumos.c.pedido_id.in_(pedido_ids))).scalars())
+    pedido_ids = set(pedido_ids) - ja_consumidos
+    if not pedido_ids:
+        return
+    # Anota o que cada pedido gasta (um INSERT ... SELECT agrupado) e tira do estoque (um UPDATE)
+    conexao.execute(insert(consumos).from_select(
+        ['pedido_id', 'material_id', 'quantidade'],
+        select(itens.c.pedido_id, receitas.c.material_id, func.sum(receitas.c.quantidade * itens.c.quantidade))
+        .select_from(itens.join(receitas, receitas.c.produto_id == itens.c.produto_id))
+        .where(itens.c.pedido_id.in_(pedido_ids))
+        .group_by(itens.c.pedido_id, receitas.c.material_id)))
+    # Só os pedidos que não tinham nada anotado: o UPDATE tira exatamente as linhas que acabaram de entrar
+    ajustar_estoque(conexao, pedido_ids, -1)
+
+def devolver(conexao, pedido_ids):
+    # Devolve pro estoque exatamente o que foi anotado e apaga a anotação
+    ajustar_estoque(conexao, pedido_ids, 1)
+    conexao.execute(delete(consumos).where(consumos.c.pedido_id.in_(pedido_ids)))
+
+def soltar_consumos(conexao, pedido_ids):
+    # Pedido apagado: o consumo fica anotado (o material saiu mesmo), mas sem pedido.
+    # No SQLite o próximo pedido pode ganhar o mesmo id e herdaria essas linhas.
+    conexao.execute(update(consumos).where(consumos.c.pedido_id.in_(pedido_ids)).values(pedido_id=None))
+
+def ajustar_estoque(conexao, pedido_ids, sinal):
+    total = (select(func.sum(consumos.c.quantidade))
+             .where(consumos.c.material_id == materiais.c.id, consumos.c.pedido_id.in_(pedido_ids))
+             .scalar_subquery())
+    conexao.execute(update(materiais)
+                    .where(materiais.c.id.in_(select(consumos.c.material_id).where(consumos.c.pedido_id.in_(pedido_ids))))
+                    .values(estoque_atual=materiais.c.estoque_atual + sinal * total))
+
+# Antes de gravar: descobre quais pedidos entram ou saem de "consumido" (ou mudaram de itens depois de sair).
+# O status antigo vem do banco (não do histórico do objeto, que some se o objeto estava expirado).
+@event.listens_for(SessaoRoteada, 'before_flush')
+def capturar_mudancas_status(sessao_db, contexto, instancias):
+    apagados = {obj.id for obj in sessao_db.deleted if isinstance(obj, Pedido)}
+    if apagados:
+        sessao_db.info.setdefault('estoque_soltar', set()).update(apagados)
+
+    novos_status = {obj.id: obj.status for obj in sessao_db.dirty
+                    if isinstance(obj, Pedido) and obj.id is not None and inspect(obj).attrs.status.history.added}
+    itens_mudados = {obj.pedido_id or (obj.pedido.id if obj.pedido else None)
+                     for obj in list(sessao_db.new) + list(sessao_db.dirty) + list(sessao_db.deleted)
+                     if isinstance(obj, ItemPedido)}
+    itens_mudados -= apagados | {None}
+    if not novos_status and not itens_mudados:
+        return
+
+    # "Já consumido" é ter linhas em Consumos (cancelado depois de enviado continua com elas)
+    ja_consumido = select(consumos.c.id).where(consumos.c.pedido_id == pedidos.c.id).exists()
+    antigos = sessao_db.connection().execute(
+        select(pedidos.c.id, pedidos.c.status, ja_consumido)
+        .where(pedidos.c.id.in_(set(novos_status) | itens_mudados))).all()
+    entrar = sessao_db.info.setdefault('estoque_consumir', set())
+    sair = sessao_db.info.setdefault('estoque_devolver', set())
+    for pedido_id, status_antigo, tem_consumo in antigos:
+        status_novo = novos_status.get(pedido_id, status_antigo)
+        era_consumido = status_antigo in STATUS_CONSUMIDO
+        vai_consumir = status_novo in STATUS_CONSUMIDO
+        if era_consumido and vai_consumir and pedido_id in itens_mudados:
+            # Mexeram nos itens de um pedido que já saiu: devolve o anotado e consome de novo com os itens de agora
+            sair.add(pedido_id)
+            entrar.add(pedido_id)
+        elif vai_consumir and not era_consumido and not tem_consumo:
+            entrar.add(pedido_id)
+        elif era_consumido and not vai_consumir and status_novo not in STATUS_CANCELADO:
+            # Voltou pra produção: o material volta pro estoque (cancelado depois de enviado não volta)
+            sair.add(pedido_id)
+
+# Depois de gravar (itens e status já no banco): aplica tudo com poucas consultas
+@event.listens_for(SessaoRoteada, 'after_flush')
+def aplicar_consumo(sessao_db, contexto):
+    soltar = sessao_db.info.pop('estoque_soltar', None)
+    entrar = sessao_db.info.pop('estoque_consumir', None)
+    sair = sessao_db.info.pop('estoque_devolver', None)
+    if soltar:
+        soltar_consumos(sessao_db.connection(), soltar)
+    if sair:
+        devolver(sessao_db.connection(), sair)
+    if entrar:
+        consumir(sessao_db.connection(), entrar)
+
+@event.listens_for(SessaoRoteada, 'after_rollback')
+def esquecer_mudancas_status(sessao_db):
+    sessao_db.info.pop('estoque_soltar', None)
+    sessao_db.info.pop('estoque_consumir', None)
+    sessao_db.info.pop('estoque_devolver', None)
+
+def saldo_materiais(ordenar_por_falta=False):
+    # Quanto de cada material os pedidos em aberto vão gastar (o reservado), numa consulta só
+    necessidade = (select(receitas.c.material_id, func.sum(receitas.c.quantidade * itens.c.quantidade).label('reservado'))
+                   .select_from(receitas
+                                .join(itens, itens.c.produto_id == receitas.c.produto_id)
+                                .join(pedidos, pedidos.c.id == itens.c.pedido_id))
+                   .where(pedidos.c.status.notin_(STATUS_CONSUMIDO + STATUS_CANCELADO))
+                   .group_by(receitas.c.material_id)
+                   .subquery())
+    reservado = func.coalesce(necessidade.c.reservado, 0.0)
+    falta = reservado - materiais.c.estoque_atual
+    consulta = (select(materiais.c.id, materiais.c.nome, materiais.c.unidade, materiais.c.estoque_atual,
+                       reservado.label('reservado'), (materiais.c.estoque_atual - reservado).label('disponivel'),
+                       falta.label('falta'))
+                .select_from(materiais.outerjoin(necessidade, necessidade.c.material_id == materiais.c.id)))
+    consulta = consulta.order_by(falta.desc(), materiais.c.nome) if ordenar_por_falta else consulta.order_by(materiais.c.nome)
+    return db.session.execute(consulta).all()
+
+def relatorio_falta():
+    return saldo_materiais(ordenar_por_falta=True)
@@ -0,0 +1,107 @@
+import json
+import time
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, insert, inspect, text
+from extensoes import db, SessaoRoteada
+from modelos import Pedido, ItemPedido, Pagamento, CustoEnvio, Evento
+
+# --- EVENTOS (Outbox: registro de tudo que muda em pedidos) ---
+# Toda mudança em pedido, item, pagamento ou taxa vira uma linha em Eventos no MESMO commit.
+# Se o commit falhar, o evento some junto; se der certo, o evento está lá com certeza.
+# Quem quiser reagir (WhatsApp, planilha, cache...) lê os eventos a partir do último id que viu,
+# em vez de ficar varrendo as tabelas.
+
+TABELAS_COM_EVENTO = (Pedido, ItemPedido, Pagamento, CustoEnvio)
+
+def pedido_do_registro(obj):
+    return obj.id if isinstance(obj, Pedido) else obj.pedido_id
+
+def campos(obj, so_alterados=False):
+    # Pega as colunas do registro (ou só as que mudaram) num dicionário simples
+    estado = inspect(obj)
+    dados = {}
+    for coluna in estado.mapper.column_attrs:
+        atributo = estado.attrs[coluna.key]
+        if so_alterados and not atributo.history.has_changes():
+            continue
+        dados[coluna.key] = atributo.value
+    return dados
+
+def compactar(dados):
+    return json.dumps(dados, separators=(',', ':'), default=str, ensure_ascii=False)
+
+# Roda depois do flush (aí os registros novos já têm id), ainda dentro da mesma transação
+@event.listens_for(SessaoRoteada, 'after_flush')
+def registrar_eventos(sessao_db, contexto):
+    linhas = []
+    for obj in sessao_db.new:
+        if isinstance(obj, TABELAS_COM_EVENTO):
+            linhas.append(dict(tabela=obj.__tablename__, operacao='criado', registro_id=obj.id,
+                               pedido_id=pedido_do_registro(obj), dados=compactar(campos(obj))))
+    for obj in sessao_db.dirty:
+        if isinstance(obj, TABELAS_COM_EVENTO):
+            alterados = campos(obj, so_alterados=True)
+            if alterados:
+                linhas.append(dict(tabela=obj.__tablename__, operacao='alterado', registro_id=obj.id,
+                                   pedido_id=pedido_do_registro(obj), dados=compactar(alterados)))
+    for obj in sessao_db.deleted:
+        if isinstance(obj, TABELAS_COM_EVENTO):
+            linhas.append(dict(tabela=obj.__tablename__, operacao='apagado', registro_id=obj.id,
+                               pedido_id=pedido_do_registro(obj), dados=None))
+
+    if linhas:
+        conexao = sessao_db.connection()
+        travar_fila_de_eventos(conexao)
+        # Um INSERT só com todas as linhas
+        conexao.execute(insert(Evento.__table__), linhas)
+
+# Número qualquer, fixo, que identifica a trava da fila de eventos no Postgres
+TRAVA_EVENTOS = 7426001
+
+def travar_fila_de_eventos(conexao):
+    # O id do evento é o cursor, então ids menores têm que aparecer (commit) antes dos maiores.
+    # No Postgres, com vários workers, o id 11 poderia ser commitado antes do 10 e o consumidor pularia o 10.
+    # Essa trava vale até o commit/rollback: quem grava evento espera a transação anterior terminar.
+    # (O SQLite já deixa só uma transação escrever por vez, não precisa.)
+    if conexao.dialect.name == 'postgresql':
+        conexao.execute(text('SELECT pg_advisory_xact_lock(:chave)'), {'chave': TRAVA_EVENTOS})
+
+def ler_eventos(desde=0, limite=100):
+    # Devolve os eventos depois do cursor "desde" e o novo cursor (id do último lido)
+    eventos = Evento.query.filter(Evento.id > desde).order_by(Evento.id).limit(limite).all()
+    cursor = eventos[-1].id if eventos else desde
+    return eventos, cursor
+
+def evento_pra_dict(evento):
+    return {
+        'id': evento.id,
+        'tabela': evento.tabela,
+        'operacao': evento.operacao,
+        'registro_id': evento.registro_id,
+        'pedido_id': evento.pedido_id,
+        'dados': json.loads(evento.dados) if evento.dados else None,
+        'criado_em': evento.criado_em.isoformat() if evento.criado_em else None,
+    }
+
+# --- COMANDO: flask --app app consumir-eventos --desde 0 ---
+# Consumidor local de exemplo: imprime cada evento numa linha de JSON.
+@click.command('consumir-eventos')
+@with_appcontext
+@click.option('--desde', type=int, default=0, help='Cursor: id do último evento já processado.')
+@click.option('--lote', type=int, default=100, help='Quantos eventos ler por vez.')
+@click.option('--seguir', is_flag=True, help='Fica esperando eventos novos (Ctrl+C pra sair).')
+def consumir_eventos_comando(desde, lote, seguir):
+    """Lê os eventos de pedidos a partir de um cursor e imprime em JSON."""
+    cursor = desde
+    while True:
+        eventos, cursor = ler_eventos(cursor, lote)
+        for evento in eventos:
+            click.echo(compactar(evento_pra_dict(evento)))
+        # Solta a transação pra enxergar o que for gravado depois
+        db.session.remove()
+        if len(eventos) < lote:
+            if not seguir:
+                break
+            time.sleep(2)
+    click.echo(f'cursor={cursor}', err=True)
@@ -0,0 +1,89 @@
+import time
+from functools import wraps
+from flask import current_app, session, g, has_request_context
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from flask_mail import Mail
+from sqlalchemy import event, text
+
+# --- EXTENSÕES (Criadas sem app, ligadas depois no criar_app) ---
+# Assim dá pra importar os modelos e as rotas sem montar o site inteiro.
+
+# --- RÉPLICA DE LEITURA (Opcional) ---
+# Guarda o resultado da última checagem de atraso (não precisa medir a cada consulta)
+estado_replica = {'checado_em': 0.0, 'saudavel': False}
+
+def replica_saudavel(engine):
+    # Reaproveita a última medição por um tempo. Esse tempo nunca passa do atraso máximo:
+    # senão um "tá saudável" velho mandaria pra réplica quem já saiu da janela de leitura no principal.
+    agora = time.time()
+    intervalo = min(current_app.config['REPLICA_INTERVALO_CHECAGEM'], current_app.config['REPLICA_ATRASO_MAXIMO'])
+    if agora - estado_replica['checado_em'] < intervalo:
+        return estado_replica['saudavel']
+
+    try:
+        with engine.connect() as conn:
+            atraso = 0.0
+            if engine.dialect.name == 'postgresql':
+                # Se já aplicou tudo que recebeu, atraso é zero; senão mede pelo horário da última transação aplicada
+                atraso = conn.execute(text(
+                    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+                )).scalar()
+            else:
+                # SQLite (teste local) não replica sozinho, só confere se responde
+                conn.execute(text("SELECT 1"))
+        saudavel = float(atraso) <= current_app.config['REPLICA_ATRASO_MAXIMO']
+    except Exception:
+        # Réplica fora do ar: tudo vai pro principal
+        saudavel = False
+
+    estado_replica['checado_em'] = agora
+    estado_replica['saudavel'] = saudavel
+    return saudavel
+
+class SessaoRoteada(Session):
+    # Decide em qual banco cada consulta roda: réplica pra leitura, principal pro resto
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.pode_usar_replica():
+            return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def pode_usar_replica(self):
+        if 'replica' not in self._db.engines:
+            return False
+        if not has_request_context() or not g.get('somente_leitura'):
+            return False
+        # Tem coisa pra gravar nessa sessão? Então é principal
+        if self._flushing or self.new or self.dirty or self.deleted:
+            return False
+        # Quem gravou agora há pouco precisa ver o que gravou (a réplica pode não ter recebido ainda)
+        if time.time() - session.get('ultima_escrita', 0) < current_app.config['REPLICA_ATRASO_MAXIMO']:
+            return False
+        return replica_saudavel(self._db.engines['replica'])
+
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
+mail = Mail()
+
+# Marca que essa sessão gravou alguma coisa no banco
+@event.listens_for(SessaoRoteada, 'after_flush')
+def marcar_escrita(sessao_db, contexto):
+    sessao_db.info['escreveu'] = True
+
+# Depois do commit, anota no cookie a hora da gravação pra próxima leitura ir no principal
+@event.listens_for(SessaoRoteada, 'after_commit')
+def registrar_escrita(sessao_db):
+    if sessao_db.info.pop('escreveu', False) and has_request_context():
+        session['ultima_escrita'] = time.time()
+
+@event.listens_for(SessaoRoteada, 'after_rollback')
+def limpar_escrita(sessao_db):
+    sessao_db.info.pop('escreveu', None)
+
+# Decorador pras rotas que só leem: essas podem ir pra réplica
+def somente_leitura(rota):
+    @wraps(rota)
+    def decorada(*args, **kwargs):
+        g.somente_leitura = True
+        return rota(*args, **kwargs)
+    return decorada
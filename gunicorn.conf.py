@@ -0,0 +1,22 @@
+import gc
+
+# --- CONFIGURAÇÃO DO GUNICORN (Lida sozinha quando roda "gunicorn app:app") ---
+
+# Monta o app uma vez só no processo mestre e depois copia pros workers.
+# Os workers dividem a mesma memória (copy-on-write) em vez de cada um montar o seu.
+preload_app = True
+
+def when_ready(server):
+    # Tudo que foi carregado até aqui não vai mais mudar: tira do coletor de lixo
+    # pra ele não mexer nesses objetos e estragar o compartilhamento de memória.
+    gc.collect()
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Conexão de banco não pode ser dividida entre processos.
+    # Cada worker joga fora as que herdou do mestre e abre as suas.
+    from app import app
+    from extensoes import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,146 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Text, func
+from sqlalchemy.orm import relationship
+from werkzeug.security import generate_password_hash, check_password_hash
+from extensoes import db
+
+# --- AS TABELAS DO BANCO (MODELOS) ---
+
+class User(db.Model):
+    __tablename__ = 'users'
+    id = Column(Integer, primary_key=True)
+    username = Column(String(80), unique=True, nullable=False)
+    email = Column(String(120), unique=True, nullable=False) # Agora temos e-mail pra recuperar senha
+    password_hash = Column(String(256), nullable=False)
+
+    # Criptografa a senha antes de salvar
+    def set_password(self, password):
+        self.password_hash = generate_password_hash(password)
+
+    # Verifica se a senha bate
+    def check_password(self, password):
+        return check_password_hash(self.password_hash, password)
+
+class Cliente(db.Model):
+    __tablename__ = 'Clientes'
+    id = Column(Integer, primary_key=True)
+    nome = Column(String(100), nullable=False)
+    email = Column(String(100), unique=True)
+    endereco = Column(String(200), nullable=False)
+    loja = Column(String(100), nullable=True)
+    telefone = Column(String(20), nullable=False)
+    estado_uf = Column(String(2), nullable=False)
+    tipo_cliente = Column(String(100), nullable=False)
+    # Link pra saber quais pedidos são desse cliente
+    pedidos = relationship('Pedido', back_populates='cliente')
+
+class Produto(db.Model):
+    __tablename__ = 'Produtos'
+    id = Column(Integer, primary_key=True)
+    nome_produto = Column(String(100), nullable=False)
+    preco_varejo = Column(Float, nullable=False)
+    preco_atacado = Column(Float, nullable=False)
+    preco_atacarejo = Column(Float, nullable=False)
+    preco_atacado_premium = Column(Float, nullable=False)
+    custo_producao =  Column(Float, nullable=False)
+    tempo_producao = Column(Float, nullable=False)
+    # Lista de materiais (quanto de cada material vai em uma peça)
+    receita = relationship('ItemReceita', back_populates='produto', cascade="all, delete-orphan")
+
+class Pedido(db.Model):
+    __tablename__ = 'Pedidos'
+    id = Column(Integer, primary_key=True)
+    cliente_id = Column(Integer, ForeignKey('Clientes.id'), nullable=False)
+    data_pedido = Column(DateTime, default=func.now())
+    prazo_entrega = Column(Date, nullable=True)
+    status = Column(String(50), default='Pendente')
+    forma_envio = Column(String(50), nullable=False)
+    desconto = Column(Float, default=0.0)
+    
+    # Amarrações com as outras tabelas
+    cliente = relationship('Cliente', back_populates='pedidos')
+    itens = relationship('ItemPedido', back_populates='pedido', cascade="all, delete-orphan")
+    pagamentos = relationship('Pagamento', back_populates='pedido', cascade="all, delete-orphan")
+    custos_envios = relationship('CustoEnvio', back_populates='pedido', cascade="all, delete-orphan")
+
+class ItemPedido(db.Model):
+    __tablename__ = 'Itens_Pedido'
+    id = Column(Integer, primary_key=True)
+    pedido_id = Column(Integer, ForeignKey('Pedidos.id'), nullable=False)
+    produto_id = Column(Integer, ForeignKey('Produtos.id'), nullable=False)
+    quantidade = Column(Integer, nullable=False)
+    preco_unitario_na_venda = Column(Float, nullable=False)
+    custo_unitario_na_venda = Column(Float, nullable=False)
+    cor = Column(String(50), nullable=True)
+    
+    pedido = relationship('Pedido', back_populates='itens')
+    produto = relationship('Produto')
+
+class Pagamento(db.Model):
+    __tablename__ = 'Pagamentos'
+    id = Column(Integer, primary_key=True)
+    pedido_id = Column(Integer, ForeignKey('Pedidos.id'), nullable=False)
+    metodo = Column(String(50), nullable=False)
+    valor = Column(Float, nullable=False)
+    pedido = relationship('Pedido', back_populates='pagamentos')
+
+class CustoEnvio(db.Model):
+    __tablename__ = 'Custos_Envio'
+    id = Column(Integer, primary_key=True)
+    pedido_id = Column(Integer, ForeignKey('Pedidos.id'), nullable=False)
+    tipo_custo = Column(String(50), nullable=False)
+    valor = Column(Float, nullable=False)
+    status = Column(String(20), default='Pendente')
+    pedido = relationship('Pedido', back_populates='custos_envios')
+
+class Recibo(db.Model):
+    __tablename__ = 'Recibos'
+    # Um recibo por pedido. O arquivo fica salvo com o nome do hash do conteúdo.
+    pedido_id = Column(Integer, ForeignKey('Pedidos.id', ondelete='CASCADE'), primary_key=True)
+    hash_conteudo = Column(String(64), nullable=True, index=True) # Vazio = precisa gerar de novo
+    # Sobe a cada mudança no pedido: só grava o hash se ninguém mexeu no pedido enquanto renderizava
+    versao = Column(Integer, nullable=False, default=0)
+    gerado_em = Column(DateTime, default=func.now())
+
+class Material(db.Model):
+    __tablename__ = 'Materiais'
+    id = Column(Integer, primary_key=True)
+    nome = Column(String(100), nullable=False)
+    unidade = Column(String(20), nullable=False) # m, un, g...
+    estoque_atual = Column(Float, nullable=False, default=0.0)
+    # O reservado pros pedidos em aberto não fica guardado: é calculado na hora (estoque.saldo_materiais)
+
+class ItemReceita(db.Model):
+    __tablename__ = 'Receitas'
+    id = Column(Integer, primary_key=True)
+    produto_id = Column(Integer, ForeignKey('Produtos.id'), nullable=False)
+    material_id = Column(Integer, ForeignKey('Materiais.id'), nullable=False)
+    quantidade = Column(Float, nullable=False) # Por peça produzida
+
+    produto = relationship('Produto', back_populates='receita')
+    material = relationship('Material')
+
+class Consumo(db.Model):
+    __tablename__ = 'Consumos'
+    # Quanto cada pedido enviado tirou do estoque (pra devolver certinho se o envio for desfeito)
+    id = Column(Integer, primary_key=True)
+    # Sem ForeignKey: o consumo fica mesmo se o pedido for apagado (aí o pedido_id fica vazio,
+    # pra um pedido novo que ganhe o mesmo id não herdar essas linhas)
+    pedido_id = Column(Integer, nullable=True, index=True)
+    material_id = Column(Integer, ForeignKey('Materiais.id'), nullable=False)
+    quantidade = Column(Float, nullable=False)
+
+class Evento(db.Model):
+    __tablename__ = 'Eventos'
+    # O id é o cursor: quem consome guarda o último id que leu e pede os próximos
+    id = Column(Integer, primary_key=True)
+    tabela = Column(String(30), nullable=False)
+    operacao = Column(String(10), nullable=False) # criado, alterado, apagado
+    registro_id = Column(Integer, nullable=False)
+    pedido_id = Column(Integer, nullable=True) # Sem ForeignKey: o evento fica mesmo se o pedido for apagado
+    dados = Column(Text, nullable=True) # JSON só com os campos que mudaram
+    criado_em = Column(DateTime, default=func.now())
+
+# --- GANCHOS (Rodam a cada gravação, então ficam registrados junto com os modelos) ---
+import recibos
+import estoque
+import eventos
@@ -0,0 +1,250 @@
+import os
+import time
+import hashlib
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import click
+from flask import current_app, has_app_context
+from flask.cli import with_appcontext
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from extensoes import db, SessaoRoteada
+from modelos import Cliente, Produto, Pedido, ItemPedido, Pagamento, CustoEnvio, Recibo
+
+# --- RECIBOS (Resumo do pedido pronto pra imprimir / mandar pro cliente) ---
+# O recibo é um HTML que não depende do site (CSS junto, sem links internos).
+# Fica salvo numa pasta com o nome do hash do conteúdo e só é refeito quando o pedido muda.
+# Pra PDF é só abrir e mandar imprimir (o navegador salva em PDF).
+
+pasta_templates = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Jinja "puro" (sem Flask) pra funcionar também dentro dos processos da geração em lote
+ambiente_jinja = Environment(loader=FileSystemLoader(pasta_templates), autoescape=select_autoescape(['html']))
+
+def pasta_recibos():
+    return current_app.config.get('RECIBOS_PASTA') or os.path.join(current_app.instance_path, 'recibos')
+
+def resumo_financeiro(pedido):
+    # Faz a matemática toda pra mostrar o resumo financeiro
+    total_prod = sum(item.preco_unitario_na_venda * item.quantidade for item in pedido.itens)
+    desc = pedido.desconto if pedido.desconto else 0.0
+    liq = total_prod - desc
+    taxas = sum(c.valor for c in pedido.custos_envios)
+    geral = liq + taxas
+    pago = sum(p.valor for p in pedido.pagamentos)
+    pend = geral - pago
+    return dict(total_produtos=total_prod, valor_desconto=desc, total_produtos_liquido=liq, total_taxas=taxas,
+                total_geral=geral, total_pago=pago, valor_pendente=pend)
+
+def montar_dados_recibo(pedido):
+    # Tira uma "foto" do pedido em dicionário simples (dá pra mandar pra outro processo)
+    dados = {
+        'id': pedido.id,
+        'data_pedido': pedido.data_pedido.strftime('%d/%m/%Y') if pedido.data_pedido else '',
+        'prazo_entrega': pedido.prazo_entrega.strftime('%d/%m/%Y') if pedido.prazo_entrega else '',
+        'status': pedido.status,
+        'forma_envio': pedido.forma_envio,
+        'cliente': {
+            'nome': pedido.cliente.nome,
+            'telefone': pedido.cliente.telefone,
+            'endereco': pedido.cliente.endereco,
+            'estado_uf': pedido.cliente.estado_uf,
+        },
+        'itens': [{'produto': item.produto.nome_produto, 'cor': item.cor, 'quantidade': item.quantidade,
+                   'preco_unitario': item.preco_unitario_na_venda} for item in pedido.itens],
+        'custos': [{'tipo': c.tipo_custo, 'status': c.status, 'valor': c.valor} for c in pedido.custos_envios],
+        'pagamentos': [{'metodo': p.metodo, 'valor': p.valor} for p in pedido.pagamentos],
+    }
+    dados.update(resumo_financeiro(pedido))
+    return dados
+
+def renderizar_e_salvar(dados, pasta):
+    # Gera o HTML e salva com o nome do hash. Se já existe arquivo igual, não escreve de novo.
+    html = ambiente_jinja.get_template('recibo.html').render(recibo=dados)
+    hash_conteudo = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    caminho = os.path.join(pasta, hash_conteudo + '.html')
+
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        # Escreve num temporário e troca no final, pra ninguém ler arquivo pela metade
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(temporario, caminho)
+
+    return dados['id'], hash_conteudo
+
+def caminho_recibo(hash_conteudo):
+    return os.path.join(pasta_recibos(), hash_conteudo + '.html')
+
+def apagar_arquivos(pasta, hashes):
+    for hash_conteudo in hashes:
+        try:
+            os.remove(os.path.join(pasta, hash_conteudo + '.html'))
+        except FileNotFoundError:
+            pass
+
+def garantir_linhas(pedido_ids):
+    # Cria a linha (ainda sem hash) dos pedidos que nunca tiveram recibo e devolve a versão de cada um.
+    # A versão é lida ANTES dos dados do pedido: se alguém mudar o pedido no meio, a versão não bate mais.
+    existentes = {r.pedido_id for r in Recibo.query.filter(Recibo.pedido_id.in_(pedido_ids))}
+    for pedido_id in set(pedido_ids) - existentes:
+        db.session.add(Recibo(pedido_id=pedido_id, hash_conteudo=None, versao=0))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outra requisição criou a mesma linha ao mesmo tempo, tudo certo
+        db.session.rollback()
+    return {r.pedido_id: (r.versao, r.hash_conteudo) for r in Recibo.query.filter(Recibo.pedido_id.in_(pedido_ids))}
+
+def marcar_gerados(gerados):
+    # gerados = [(pedido_id, versao_lida, hash)]. Só grava onde a versão ainda é a mesma.
+    # Se o pedido mudou enquanto renderizava, o recibo novo já nasceu velho: o arquivo vai pro lixo.
+    recibos = Recibo.__table__
+    rejeitados = []
+    for pedido_id, versao, hash_conteudo in gerados:
+        resultado = db.session.execute(recibos.update()
+                                       .where(recibos.c.pedido_id == pedido_id, recibos.c.versao == versao)
+                                       .values(hash_conteudo=hash_conteudo, gerado_em=datetime.now()))
+        if resultado.rowcount == 0:
+            rejeitados.append(hash_conteudo)
+    db.session.commit()
+    apagar_arquivos(pasta_recibos(), rejeitados)
+    return len(gerados) - len(rejeitados)
+
+def obter_recibo(pedido_id):
+    # Devolve o hash do recibo do pedido, gerando só se não tiver um válido (None se não deu pra gerar)
+    Pedido.query.get_or_404(pedido_id)
+    for tentativa in range(3):
+        versao, hash_conteudo = garantir_linhas([pedido_id])[pedido_id]
+        if hash_conteudo and os.path.exists(caminho_recibo(hash_conteudo)):
+            return hash_conteudo
+
+        pedido = Pedido.query.get_or_404(pedido_id)
+        _, hash_conteudo = renderizar_e_salvar(montar_dados_recibo(pedido), pasta_recibos())
+        if marcar_gerados([(pedido_id, versao, hash_conteudo)]):
+            return hash_conteudo
+    # O pedido não para de mudar (o arquivo que renderizou já foi apagado): só devolve se alguém conseguiu gravar
+    return obter_recibo_atual(pedido_id)
+
+def obter_recibo_atual(pedido_id):
+    recibo = db.session.get(Recibo, pedido_id)
+    return recibo.hash_conteudo if recibo else None
+
+def gerar_recibos_periodo(inicio, fim, processos=None):
+    pedido_ids = [pid for (pid,) in db.session.query(Pedido.id)
+                  .filter(Pedido.data_pedido >= inicio, Pedido.data_pedido < fim + timedelta(days=1))]
+    if not pedido_ids:
+        return 0, 0
+
+    pasta = pasta_recibos()
+    versoes = garantir_linhas(pedido_ids)
+    pendentes_ids = [pid for pid, (versao, hash_conteudo) in versoes.items()
+                     if not (hash_conteudo and os.path.exists(os.path.join(pasta, hash_conteudo + '.html')))]
+    if not pendentes_ids:
+        return len(pedido_ids), 0
+
+    # Carrega tudo de uma vez (sem uma consulta por item) e divide a renderização entre processos
+    pedidos = (Pedido.query
+               .options(joinedload(Pedido.cliente),
+                        selectinload(Pedido.itens).joinedload(ItemPedido.produto),
+                        selectinload(Pedido.custos_envios),
+                        selectinload(Pedido.pagamentos))
+               .filter(Pedido.id.in_(pendentes_ids))
+               .all())
+    pendentes = [montar_dados_recibo(p) for p in pedidos]
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        gerados = [(pedido_id, versoes[pedido_id][0], hash_conteudo)
+                   for pedido_id, hash_conteudo in pool.map(renderizar_e_salvar, pendentes, repeat(pasta), chunksize=8)]
+    return len(pedido_ids), marcar_gerados(gerados)
+
+def limpar_recibos_orfaos(idade_minima=300):
+    # Apaga os arquivos que nenhum pedido usa mais (sobras de corrida ou de servidor que caiu no meio).
+    # Só mexe em arquivo com mais de "idade_minima" segundos, pra não pegar um que acabou de ser gerado.
+    pasta = pasta_recibos()
+    if not os.path.isdir(pasta):
+        return 0
+    em_uso = {h for (h,) in db.session.query(Recibo.hash_conteudo).filter(Recibo.hash_conteudo.isnot(None))}
+    limite = time.time() - idade_minima
+    orfaos = [nome[:-5] for nome in os.listdir(pasta)
+              if nome.endswith('.html') and nome[:-5] not in em_uso
+              and os.path.getmtime(os.path.join(pasta, nome)) < limite]
+    apagar_arquivos(pasta, orfaos)
+    return len(orfaos)
+
+# --- INVALIDAÇÃO (Pedido mudou, recibo velho sai) ---
+# Roda antes de gravar: qualquer mudança em pedido, item, pagamento ou taxa sobe a versão e limpa o hash
+# do recibo daquele pedido (pedido apagado: a linha sai). Cliente ou produto editado (nome, endereço...)
+# também aparece no recibo, então invalida os recibos dos pedidos dele. Os arquivos velhos são apagados depois do commit.
+@event.listens_for(SessaoRoteada, 'before_flush')
+def invalidar_recibos(sessao_db, contexto, instancias):
+    pedidos_mudados = set()
+    pedidos_apagados = set()
+    clientes_mudados = set()
+    produtos_mudados = set()
+    for obj in list(sessao_db.new) + list(sessao_db.dirty) + list(sessao_db.deleted):
+        if isinstance(obj, Pedido):
+            pedidos_mudados.add(obj.id)
+            if obj in sessao_db.deleted:
+                pedidos_apagados.add(obj.id)
+        elif isinstance(obj, (ItemPedido, Pagamento, CustoEnvio)):
+            pedidos_mudados.add(obj.pedido_id or (obj.pedido.id if obj.pedido else None))
+        elif isinstance(obj, Cliente) and obj in sessao_db.dirty and sessao_db.is_modified(obj, include_collections=False):
+            clientes_mudados.add(obj.id)
+        elif isinstance(obj, Produto) and obj in sessao_db.dirty and sessao_db.is_modified(obj, include_collections=False):
+            produtos_mudados.add(obj.id)
+
+    if clientes_mudados:
+        pedidos_mudados.update(sessao_db.connection().execute(select(Pedido.id).where(Pedido.cliente_id.in_(clientes_mudados))).scalars())
+    if produtos_mudados:
+        pedidos_mudados.update(sessao_db.connection().execute(select(ItemPedido.pedido_id).distinct()
+                                                              .where(ItemPedido.produto_id.in_(produtos_mudados))).scalars())
+    pedidos_mudados.discard(None)
+    if not pedidos_mudados:
+        return
+
+    recibos = Recibo.__table__
+    conexao = sessao_db.connection()
+    velhos = conexao.execute(select(recibos.c.hash_conteudo)
+                             .where(recibos.c.pedido_id.in_(pedidos_mudados), recibos.c.hash_conteudo.isnot(None))).scalars()
+    sessao_db.info.setdefault('recibos_velhos', set()).update(velhos)
+
+    conexao.execute(recibos.update()
+                    .where(recibos.c.pedido_id.in_(pedidos_mudados - pedidos_apagados))
+                    .values(hash_conteudo=None, versao=recibos.c.versao + 1))
+    if pedidos_apagados:
+        conexao.execute(recibos.delete().where(recibos.c.pedido_id.in_(pedidos_apagados)))
+
+@event.listens_for(SessaoRoteada, 'after_commit')
+def apagar_recibos_velhos(sessao_db):
+    velhos = sessao_db.info.pop('recibos_velhos', None)
+    if velhos and has_app_context():
+        apagar_arquivos(pasta_recibos(), velhos)
+
+@event.listens_for(SessaoRoteada, 'after_rollback')
+def esquecer_recibos_velhos(sessao_db):
+    sessao_db.info.pop('recibos_velhos', None)
+
+# --- COMANDO: flask --app app gerar-recibos 2026-01-01 2026-01-31 ---
+@click.command('gerar-recibos')
+@with_appcontext
+@click.argument('inicio')
+@click.argument('fim')
+@click.option('--processos', type=int, default=None, help='Quantos processos usar (padrão: um por CPU).')
+def gerar_recibos_comando(inicio, fim, processos):
+    """Gera os recibos dos pedidos feitos entre INICIO e FIM (AAAA-MM-DD)."""
+    data_inicio = datetime.strptime(inicio, '%Y-%m-%d')
+    data_fim = datetime.strptime(fim, '%Y-%m-%d')
+    total, gerados = gerar_recibos_periodo(data_inicio, data_fim, processos)
+    click.echo(f'{total} pedidos no período, {gerados} recibos gerados.')
+
+# --- COMANDO: flask --app app limpar-recibos ---
+@click.command('limpar-recibos')
+@with_appcontext
+def limpar_recibos_comando():
+    """Apaga os arquivos de recibo que nenhum pedido usa mais."""
+    click.echo(f'{limpar_recibos_orfaos()} arquivos apagados.')
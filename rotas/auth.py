@@ -0,0 +1,98 @@
+import random
+import string
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app
+from flask_mail import Message
+from extensoes import db, mail
+from modelos import User
+
+# --- LOGIN E RECUPERAÇÃO DE SENHA ---
+auth_bp = Blueprint('auth', __name__)
+
+@auth_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        # Busca o usuário no banco
+        user = User.query.filter_by(username=username).first()
+        
+        # Se achou e a senha bate
+        if user and user.check_password(password):
+            session['user_id'] = user.id
+            session['username'] = user.username
+            flash('Login realizado com sucesso!', 'success')
+            return redirect(url_for('principal.home'))
+        else:
+            flash('Usuário ou senha incorretos.', 'danger')
+            
+    return render_template('login.html')
+
+@auth_bp.route('/logout')
+def logout():
+    # Limpa a sessão (desloga) e manda pro login
+    session.clear()
+    flash('Você saiu do sistema.', 'info')
+    return redirect(url_for('auth.login'))
+
+
+# --- RECUPERAÇÃO DE SENHA (ESQUECI A SENHA) ---
+
+@auth_bp.route('/esqueci-senha', methods=['GET', 'POST'])
+def esqueci_senha():
+    if request.method == 'POST':
+        email_digitado = request.form['email']
+        user = User.query.filter_by(email=email_digitado).first()
+        
+        if user:
+            # Gera um código de 6 números aleatórios
+            codigo = ''.join(random.choices(string.digits, k=6))
+            session['reset_code'] = codigo
+            session['reset_email'] = email_digitado
+            
+            try:
+                # Dispara o e-mail
+                msg = Message('Recuperação de Senha - Ateliê Vanda',
+                              sender=current_app.config['MAIL_USERNAME'],
+                              recipients=[email_digitado])
+                msg.body = f'Seu código para recuperar a senha é: {codigo}'
+                mail.send(msg)
+                flash(f'Enviamos o código para {email_digitado}. Cheque sua caixa de entrada!', 'info')
+                return redirect(url_for('auth.validar_codigo'))
+            except Exception as e:
+                flash(f'Erro ao enviar e-mail: {str(e)}', 'danger')
+        else:
+            flash('Não achamos nenhum cadastro com esse e-mail.', 'warning')
+            
+    return render_template('esqueci_senha.html')
+
+@auth_bp.route('/validar-codigo', methods=['GET', 'POST'])
+def validar_codigo():
+    # Se tentar entrar direto sem ter pedido código, chuta de volta
+    if 'reset_code' not in session: return redirect(url_for('auth.esqueci_senha'))
+    
+    if request.method == 'POST':
+        if request.form['codigo'] == session['reset_code']:
+            # Código bateu! Pode ir trocar a senha
+            return redirect(url_for('auth.nova_senha'))
+        flash('Esse código tá errado.', 'danger')
+        
+    return render_template('validar_codigo.html')
+
+@auth_bp.route('/nova-senha', methods=['GET', 'POST'])
+def nova_senha():
+    if 'reset_email' not in session: return redirect(url_for('auth.login'))
+    
+    if request.method == 'POST':
+        user = User.query.filter_by(email=session['reset_email']).first()
+        if user:
+            user.set_password(request.form['password'])
+            db.session.commit()
+            
+            # Limpa a sessão de recuperação
+            session.pop('reset_code', None)
+            session.pop('reset_email', None)
+            
+            flash('Senha trocada! Agora pode logar.', 'success')
+            return redirect(url_for('auth.login'))
+            
+    return render_template('nova_senha.html')
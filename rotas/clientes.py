@@ -0,0 +1,85 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from extensoes import db
+from modelos import User, Cliente
+
+clientes_bp = Blueprint('clientes', __name__)
+
+# --- GESTÃO DE CLIENTES ---
+@clientes_bp.route('/clientes', methods=['GET'])
+def clientes():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    clientes_cadastrados = Cliente.query.order_by(Cliente.nome).all()
+    return render_template('clientes.html', lista_de_clientes=clientes_cadastrados)
+
+@clientes_bp.route('/clientes/novo', methods=['GET', 'POST'])
+def novo_cliente():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    if request.method == 'POST':
+        email_digitado = request.form['email']
+        if email_digitado == "": email_digitado = None # Pra não salvar string vazia
+        
+        novo = Cliente(
+            nome=request.form['nome'],
+            telefone=request.form['telefone'],
+            email=email_digitado,
+            endereco=request.form['endereco'],
+            estado_uf=request.form['estado_uf'],
+            loja=request.form['loja'],
+            tipo_cliente=request.form['tipo_cliente']
+        )
+        try:
+            db.session.add(novo)
+            db.session.commit()
+            flash('Cliente cadastrado!', 'success')
+            return redirect(url_for('clientes.clientes'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Deu erro: {e}', 'danger')
+            
+    return render_template('novo_cliente.html')
+
+@clientes_bp.route('/clientes/editar/<int:id>', methods=['GET', 'POST'])
+def editar_cliente(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    cliente = Cliente.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        cliente.nome = request.form['nome']
+        cliente.telefone = request.form['telefone']
+        cliente.email = request.form['email']
+        cliente.endereco = request.form['endereco']
+        cliente.estado_uf = request.form['estado_uf']
+        cliente.loja = request.form['loja']
+        cliente.tipo_cliente = request.form['tipo_cliente']
+        try:
+            db.session.commit()
+            flash('Cadastro atualizado!', 'success')
+            return redirect(url_for('clientes.clientes'))
+        except:
+            db.session.rollback()
+            flash('Erro ao salvar.', 'danger')
+            
+    return render_template('editar_cliente.html', cliente=cliente)
+
+@clientes_bp.route('/clientes/deletar/<int:id>', methods=['GET', 'POST'])
+def deletar_cliente(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    cliente = Cliente.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        # Segurança extra: pede senha pra deletar
+        senha = request.form['password']
+        user = User.query.get(session['user_id'])
+        if user and user.check_password(senha):
+            try:
+                db.session.delete(cliente)
+                db.session.commit()
+                flash('Cliente removido.', 'success')
+                return redirect(url_for('clientes.clientes'))
+            except Exception as e:
+                db.session.rollback()
+                flash(f'Erro: {e}', 'danger')
+        else:
+            flash('Senha incorreta.', 'danger')
+            
+    return render_template('confirmar_delete.html', cliente=cliente)
@@ -0,0 +1,16 @@
+from flask import Blueprint, request, redirect, url_for, session, jsonify
+from extensoes import somente_leitura
+from eventos import ler_eventos, evento_pra_dict
+
+eventos_bp = Blueprint('eventos', __name__)
+
+# --- EVENTOS EM JSON (Pra planilha, notificação, etc. buscarem só o que mudou) ---
+# Ex: /eventos?desde=120&limite=50 -> devolve os eventos depois do 120 e o cursor pra próxima chamada
+@eventos_bp.route('/eventos')
+@somente_leitura
+def listar_eventos():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    desde = request.args.get('desde', 0, type=int)
+    limite = min(request.args.get('limite', 100, type=int), 1000)
+    eventos, cursor = ler_eventos(desde, limite)
+    return jsonify(eventos=[evento_pra_dict(e) for e in eventos], cursor=cursor)
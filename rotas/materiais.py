@@ -0,0 +1,95 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from extensoes import db, somente_leitura
+from modelos import Produto, Material, ItemReceita
+from estoque import relatorio_falta, saldo_materiais
+
+materiais_bp = Blueprint('materiais', __name__)
+
+# --- GESTÃO DE MATERIAIS (Estoque) ---
+@materiais_bp.route('/materiais', methods=['GET'])
+def materiais():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    # Já vem com o reservado calculado pelos pedidos em aberto
+    return render_template('materiais.html', lista_de_materiais=saldo_materiais())
+
+@materiais_bp.route('/materiais/novo', methods=['GET', 'POST'])
+def novo_material():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    if request.method == 'POST':
+        try:
+            novo = Material(
+                nome=request.form['nome'],
+                unidade=request.form['unidade'],
+                estoque_atual=float(request.form['estoque_atual'] or 0)
+            )
+            db.session.add(novo)
+            db.session.commit()
+            flash('Material cadastrado!', 'success')
+            return redirect(url_for('materiais.materiais'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro: {e}', 'danger')
+
+    return render_template('editar_material.html', material=None)
+
+@materiais_bp.route('/materiais/editar/<int:id>', methods=['GET', 'POST'])
+def editar_material(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    material = Material.query.get_or_404(id)
+
+    if request.method == 'POST':
+        try:
+            material.nome = request.form['nome']
+            material.unidade = request.form['unidade']
+            material.estoque_atual = float(request.form['estoque_atual'] or 0)
+            db.session.commit()
+            flash('Material atualizado!', 'success')
+            return redirect(url_for('materiais.materiais'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro: {e}', 'danger')
+
+    return render_template('editar_material.html', material=material)
+
+# --- RECEITA DO PRODUTO (Quanto de cada material vai numa peça) ---
+@materiais_bp.route('/produtos/receita/<int:id>', methods=['GET', 'POST'])
+def receita_produto(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    produto = Produto.query.get_or_404(id)
+
+    if request.method == 'POST':
+        try:
+            material_id = int(request.form['material_id'])
+            quantidade = float(request.form['quantidade'])
+            # Se o material já está na receita, só troca a quantidade
+            linha = ItemReceita.query.filter_by(produto_id=produto.id, material_id=material_id).first()
+            if linha:
+                linha.quantidade = quantidade
+            else:
+                db.session.add(ItemReceita(produto_id=produto.id, material_id=material_id, quantidade=quantidade))
+            db.session.commit()
+            flash('Receita atualizada!', 'success')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro: {e}', 'danger')
+        return redirect(url_for('materiais.receita_produto', id=produto.id))
+
+    materiais_cadastrados = Material.query.order_by(Material.nome).all()
+    return render_template('receita_produto.html', produto=produto, materiais=materiais_cadastrados)
+
+@materiais_bp.route('/produtos/receita/remover/<int:id>', methods=['POST'])
+def remover_item_receita(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    linha = ItemReceita.query.get_or_404(id)
+    produto_id = linha.produto_id
+    db.session.delete(linha)
+    db.session.commit()
+    flash('Material removido da receita.', 'info')
+    return redirect(url_for('materiais.receita_produto', id=produto_id))
+
+# --- RELATÓRIO DE FALTA (O que os pedidos em aberto vão gastar) ---
+@materiais_bp.route('/materiais/falta')
+@somente_leitura
+def falta_materiais():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    return render_template('falta_materiais.html', linhas=relatorio_falta())
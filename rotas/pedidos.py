@@ -0,0 +1,295 @@
+import math
+import json
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_from_directory, abort
+from extensoes import db, somente_leitura
+from modelos import User, Cliente, Produto, Pedido, ItemPedido, Pagamento, CustoEnvio, Recibo
+from recibos import resumo_financeiro, obter_recibo, pasta_recibos
+
+pedidos_bp = Blueprint('pedidos', __name__)
+
+# --- ÁREA DO CLIENTE (RASTREIO) ---
+
+@pedidos_bp.route('/acompanhar_pedidos', methods=['GET', 'POST'])
+@somente_leitura
+def acompanhar_pedidos():
+    # 1. BLOQUEIO DE ADMIN:
+    # Se for você (admin) que clicou no link, manda direto pro painel de gestão.
+    # Não faz sentido admin ficar nessa tela de busca simples.
+    if 'user_id' in session:
+        return redirect(url_for('pedidos.pedidos'))
+
+    # 2. LÓGICA PRO CLIENTE:
+    pedidos = []
+    cliente_encontrado = None
+    
+    if request.method == 'POST':
+        termo = request.form.get('termo_busca')
+        
+        # Só aceita números pra busca não quebrar
+        if termo and termo.isdigit():
+            id_buscado = int(termo)
+            
+            # Primeiro tenta achar se é um código de CLIENTE
+            cliente_encontrado = Cliente.query.get(id_buscado)
+            
+            if cliente_encontrado:
+                # Achou o cliente, traz a ficha completa dele
+                pedidos = Pedido.query.filter_by(cliente_id=cliente_encontrado.id).order_by(Pedido.id.desc()).all()
+                if not pedidos:
+                    flash(f'Oi {cliente_encontrado.nome}, achamos seu cadastro mas você ainda não tem pedidos.', 'info')
+            
+            else:
+                # Não achou cliente, tenta ver se é o código do PEDIDO direto
+                pedido_unico = Pedido.query.get(id_buscado)
+                
+                if pedido_unico:
+                    # Achou o pedido! Coloca na lista pra tela funcionar igual
+                    pedidos = [pedido_unico]
+                    cliente_encontrado = pedido_unico.cliente
+                else:
+                    flash('Não encontramos nenhum cadastro nem pedido com esse número.', 'warning')
+        else:
+            flash('Por favor, digite apenas números.', 'warning')
+
+    return render_template('acompanhar_pedido.html', pedidos=pedidos, cliente=cliente_encontrado)
+
+
+# --- GESTÃO DE PEDIDOS ---
+@pedidos_bp.route('/pedidos')
+@somente_leitura
+def pedidos():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    # Mostra do mais recente pro mais antigo
+    pedidos_cadastrados = Pedido.query.order_by(Pedido.id.desc()).all()
+    return render_template('pedidos.html', lista_de_pedidos=pedidos_cadastrados)
+
+@pedidos_bp.route('/pedidos/novo', methods=['GET', 'POST'])
+def novo_pedido():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+
+    # Se estivermos editando um pedido existente, pega o ID dele
+    editar_id = request.args.get('editar_id')
+    pedido_atual = None
+    itens_existentes_json = '[]'
+
+    if editar_id:
+        pedido_atual = Pedido.query.get(editar_id)
+        if pedido_atual:
+            # Reconstrói o JSON pro javascript preencher a tela
+            lista_temp = []
+            for item in pedido_atual.itens:
+                lista_temp.append({
+                    'id': str(item.produto_id),
+                    'nome': item.produto.nome_produto,
+                    'cor': item.cor,
+                    'qty': item.quantidade,
+                    'preco': item.preco_unitario_na_venda,
+                    'tabela': 'Recuperado',
+                    'subtotal': item.preco_unitario_na_venda * item.quantidade
+                })
+            itens_existentes_json = json.dumps(lista_temp)
+
+    if request.method == 'POST':
+        try:
+            pedido_id_form = request.form.get('pedido_id_editar')
+            cliente_id = int(request.form['cliente_id'])
+            forma_envio = request.form['forma_envio']
+            itens_json = request.form['itens_carrinho']
+            lista_de_itens = json.loads(itens_json)
+
+            if not lista_de_itens:
+                flash('O carrinho está vazio!', 'warning')
+                return redirect(url_for('pedidos.novo_pedido'))
+
+            # Calcula prazo automático baseado nas horas
+            tempo_total_horas = 0
+            for item in lista_de_itens:
+                prod = Produto.query.get(int(item['id']))
+                tempo_total_horas += prod.tempo_producao * int(item['qty'])
+            
+            # Divide por 10h/dia de trabalho
+            dias_producao = math.ceil(tempo_total_horas / 10)
+            data_prazo = datetime.now() + timedelta(days=dias_producao)
+
+            if pedido_id_form:
+                # Se é edição, atualiza o existente
+                pedido_salvo = Pedido.query.get(pedido_id_form)
+                pedido_salvo.cliente_id = cliente_id
+                pedido_salvo.forma_envio = forma_envio
+                pedido_salvo.prazo_entrega = data_prazo
+                # Remove itens velhos pra colocar os novos
+                for item_velho in pedido_salvo.itens:
+                    db.session.delete(item_velho)
+            else:
+                # Cria um novo do zero
+                pedido_salvo = Pedido(
+                    cliente_id=cliente_id,
+                    forma_envio=forma_envio,
+                    data_pedido=datetime.now(),
+                    prazo_entrega=data_prazo,
+                    status="Rascunho",
+                    desconto=0.0
+                )
+                db.session.add(pedido_salvo)
+
+            # Salva os itens do carrinho no banco
+            for item in lista_de_itens:
+                produto_db = Produto.query.get(int(item['id']))
+                preco_unitario = float(item['preco']) 
+                
+                novo_item_db = ItemPedido(
+                    pedido=pedido_salvo,
+                    produto_id=produto_db.id,
+                    quantidade=int(item['qty']),
+                    preco_unitario_na_venda=preco_unitario,
+                    custo_unitario_na_venda=produto_db.custo_producao,
+                    cor=item['cor']
+                )
+                db.session.add(novo_item_db)
+
+            db.session.commit()
+            # Manda pra tela de pagamento pra fechar a conta
+            return redirect(url_for('pedidos.tela_pagamento', id=pedido_salvo.id))
+
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro ao processar: {e}', 'danger')
+
+    clientes = Cliente.query.order_by(Cliente.nome).all()
+    produtos = Produto.query.order_by(Produto.nome_produto).all()
+    
+    proximo_id_tela = "Novo"
+    if pedido_atual:
+        proximo_id_tela = pedido_atual.id
+    
+    return render_template('novo_pedido.html', 
+                           clientes=clientes, 
+                           produtos=produtos, 
+                           proximo_id=proximo_id_tela,
+                           pedido_atual=pedido_atual,
+                           itens_pre_carregados=itens_existentes_json)
+
+@pedidos_bp.route('/pedidos/pagamento/<int:id>', methods=['GET'])
+def tela_pagamento(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    pedido = Pedido.query.get_or_404(id)
+    
+    total_valor = 0
+    total_horas = 0
+    
+    for item in pedido.itens:
+        total_valor += item.preco_unitario_na_venda * item.quantidade
+        prod = Produto.query.get(item.produto_id)
+        total_horas += prod.tempo_producao * item.quantidade
+        
+    dias = math.ceil(total_horas / 10)
+    
+    return render_template('pagamento_pedido.html', pedido=pedido, total_valor=total_valor, total_horas=total_horas, dias_producao=dias)
+
+@pedidos_bp.route('/pedidos/salvar_pagamento/<int:id>', methods=['POST'])
+def salvar_pagamento(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    pedido = Pedido.query.get_or_404(id)
+    try:
+        pedido.desconto = float(request.form['valor_desconto_final'])
+        
+        # Pega a data que o usuário confirmou na tela
+        data_texto = request.form['prazo_entrega']
+        pedido.prazo_entrega = datetime.strptime(data_texto, '%Y-%m-%d').date()
+
+        # Se teve sinal/pagamento
+        v_sinal = float(request.form['valor_pago']) if request.form['valor_pago'] else 0.0
+        if v_sinal > 0:
+            pgto = Pagamento(pedido_id=pedido.id, metodo=request.form['metodo_pagamento'], valor=v_sinal)
+            db.session.add(pgto)
+
+        # Taxas extras (frete, etc)
+        taxas = request.form['lista_taxas_json']
+        if taxas:
+            lista = json.loads(taxas)
+            for t in lista:
+                nc = CustoEnvio(pedido_id=pedido.id, tipo_custo=t['tipo'], valor=float(t['valor']), status=t['status'])
+                db.session.add(nc)
+                if t['status'] == 'Pago':
+                    pgto_t = Pagamento(pedido_id=pedido.id, metodo="Taxa/Outro", valor=float(t['valor']))
+                    db.session.add(pgto_t)
+        
+        pedido.status = "Pendente" 
+        db.session.commit()
+        flash(f'Pedido #{pedido.id} fechado com sucesso!', 'success')
+        return redirect(url_for('pedidos.pedidos'))
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erro: {e}', 'danger')
+        return redirect(url_for('pedidos.tela_pagamento', id=id))
+
+@pedidos_bp.route('/pedidos/detalhes/<int:id>')
+def detalhes_pedido(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    pedido = Pedido.query.get_or_404(id)
+    return render_template('detalhes_pedido.html', pedido=pedido, **resumo_financeiro(pedido))
+
+# --- RECIBO (Versão pronta pra mandar pro cliente) ---
+@pedidos_bp.route('/pedidos/recibo/<int:id>')
+def recibo_pedido(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    # Só gera se o pedido mudou desde o último recibo; senão reaproveita o arquivo
+    hash_conteudo = obter_recibo(id)
+    if not hash_conteudo:
+        flash('O pedido mudou enquanto o recibo era gerado. Tenta de novo em instantes.', 'warning')
+        return redirect(url_for('pedidos.detalhes_pedido', id=id))
+    return redirect(url_for('pedidos.arquivo_recibo', hash_conteudo=hash_conteudo))
+
+# Link que dá pra mandar pro cliente: o nome é o hash do conteúdo, ninguém adivinha
+@pedidos_bp.route('/recibos/<hash_conteudo>.html')
+def arquivo_recibo(hash_conteudo):
+    # Recibo velho (pedido mudou ou foi apagado) não abre mais
+    if not Recibo.query.filter_by(hash_conteudo=hash_conteudo).first():
+        abort(404)
+    resposta = send_from_directory(pasta_recibos(), hash_conteudo + '.html', max_age=60 * 60 * 24 * 365)
+    # Tem nome, telefone e endereço do cliente: só o navegador guarda, proxy/CDN não
+    resposta.cache_control.public = False
+    resposta.cache_control.private = True
+    return resposta
+
+@pedidos_bp.route('/pedidos/editar/<int:id>', methods=['GET', 'POST'])
+def editar_pedido(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    pedido = Pedido.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        try:
+            pedido.status = request.form['status']
+            pedido.forma_envio = request.form['forma_envio']
+            pedido.prazo_entrega = datetime.strptime(request.form['prazo_entrega'], '%Y-%m-%d').date()
+            db.session.commit()
+            flash('Pedido atualizado!', 'success')
+            return redirect(url_for('pedidos.pedidos'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro: {e}', 'danger')
+            
+    return render_template('editar_pedido.html', pedido=pedido)
+
+@pedidos_bp.route('/pedidos/deletar/<int:id>', methods=['GET', 'POST'])
+def deletar_pedido(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    pedido = Pedido.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        senha = request.form['password']
+        user = User.query.get(session['user_id'])
+        if user and user.check_password(senha):
+            try:
+                db.session.delete(pedido)
+                db.session.commit()
+                flash('Pedido excluído.', 'success')
+                return redirect(url_for('pedidos.pedidos'))
+            except Exception as e:
+                db.session.rollback()
+                flash(f'Erro: {e}', 'danger')
+        else:
+            flash('Senha incorreta.', 'danger')
+            
+    return render_template('confirmar_delete_pedido.html', pedido=pedido)
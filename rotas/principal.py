@@ -0,0 +1,43 @@
+import os
+from flask import Blueprint, render_template, redirect, url_for, session, current_app
+from extensoes import somente_leitura
+from modelos import Cliente, Produto, Pedido
+
+# --- PÁGINAS GERAIS (Vitrine, Home, Dashboard) ---
+principal_bp = Blueprint('principal', __name__)
+
+# --- ROTA INICIAL (VITRINE) ---
+@principal_bp.route('/')
+def index():
+    # Se a Vanda tiver logada, manda ela direto pro trabalho (Home do sistema)
+    if 'user_id' in session:
+        return redirect(url_for('principal.home'))
+        
+    # Se for visita (cliente), mostra a vitrine bonita com as fotos
+    return render_template('index.html')
+
+# --- ÁREA RESTRITA (SÓ COM LOGIN) ---
+
+@principal_bp.route('/home')
+def home():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    return render_template('home.html')
+
+@principal_bp.route('/dashboard')
+@somente_leitura
+def dashboard():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    # Conta tudo pra mostrar os resumos
+    total_pedidos = Pedido.query.count()
+    total_clientes = Cliente.query.count()
+    total_produtos = Produto.query.count()
+    return render_template('dashboard.html', qtd_pedidos=total_pedidos, qtd_clientes=total_clientes, qtd_produtos=total_produtos)
+
+# --- DEBUG (Pra ver se os arquivos tão lá) ---
+@principal_bp.route('/debug')
+def debug():
+    try:
+        conteudo = os.listdir(os.path.join(current_app.static_folder, 'css'))
+        return f"CSS Encontrado: {conteudo}"
+    except Exception as e:
+        return f"Erro ao ler estáticos: {e}"
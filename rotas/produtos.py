@@ -0,0 +1,81 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from extensoes import db
+from modelos import User, Produto
+
+produtos_bp = Blueprint('produtos', __name__)
+
+# --- GESTÃO DE PRODUTOS ---
+@produtos_bp.route('/produtos', methods=['GET'])
+def produtos():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    produtos_cadastrados = Produto.query.order_by(Produto.nome_produto).all()
+    return render_template('produtos.html', lista_de_produtos=produtos_cadastrados)
+
+@produtos_bp.route('/produtos/novo', methods=['GET', 'POST'])
+def novo_produto():
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    if request.method == 'POST':
+        try:
+            novo = Produto(
+                nome_produto=request.form['nome_produto'],
+                preco_varejo=float(request.form['preco_varejo']),
+                preco_atacado=float(request.form['preco_atacado']),
+                preco_atacarejo=float(request.form['preco_atacarejo']),
+                preco_atacado_premium=float(request.form['preco_atacado_premium']),
+                custo_producao=float(request.form['custo_producao']),
+                tempo_producao=float(request.form['tempo_producao'])
+            )
+            db.session.add(novo)
+            db.session.commit()
+            flash('Produto criado!', 'success')
+            return redirect(url_for('produtos.produtos'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro: {e}', 'danger')
+            
+    return render_template('novo_produto.html')
+
+@produtos_bp.route('/produtos/editar/<int:id>', methods=['GET', 'POST'])
+def editar_produto(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    produto = Produto.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        try:
+            produto.nome_produto = request.form['nome_produto']
+            produto.preco_varejo = float(request.form['preco_varejo'])
+            produto.preco_atacado = float(request.form['preco_atacado'])
+            produto.preco_atacarejo = float(request.form['preco_atacarejo'])
+            produto.preco_atacado_premium = float(request.form['preco_atacado_premium'])
+            produto.custo_producao = float(request.form['custo_producao'])
+            produto.tempo_producao = float(request.form['tempo_producao'])
+            db.session.commit()
+            flash('Produto atualizado!', 'success')
+            return redirect(url_for('produtos.produtos'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro: {e}', 'danger')
+            
+    return render_template('editar_produto.html', produto=produto)
+
+@produtos_bp.route('/produtos/deletar/<int:id>', methods=['GET', 'POST'])
+def deletar_produto(id):
+    if 'user_id' not in session: return redirect(url_for('auth.login'))
+    produto = Produto.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        senha = request.form['password']
+        user = User.query.get(session['user_id'])
+        if user and user.check_password(senha):
+            try:
+                db.session.delete(produto)
+                db.session.commit()
+                flash('Produto removido.', 'success')
+                return redirect(url_for('produtos.produtos'))
+            except Exception as e:
+                db.session.rollback()
+                flash(f'Erro: {e}', 'danger')
+        else:
+            flash('Senha incorreta.', 'danger')
+            
+    return render_template('confirmar_delete_produto.html', produto=produto)
@@ -0,0 +1,45 @@
+import json
+import pytest
+from app import criar_app
+from extensoes import db
+from modelos import User, Cliente, Produto
+
+@pytest.fixture
+def app(tmp_path):
+    # Cada teste ganha um banco SQLite novo numa pasta temporária
+    app = criar_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'loja.db'),
+        'RECIBOS_PASTA': str(tmp_path / 'recibos'),
+    })
+    with app.app_context():
+        db.create_all()
+        user = User(username='vanda', email='vanda@teste.com')
+        user.set_password('senha')
+        db.session.add(user)
+        db.session.add(Cliente(nome='Cliente Teste', endereco='Rua A', telefone='83999999999',
+                               estado_uf='PB', tipo_cliente='Varejo'))
+        db.session.add(Produto(nome_produto='Biquíni', preco_varejo=100, preco_atacado=80, preco_atacarejo=90,
+                               preco_atacado_premium=70, custo_producao=30, tempo_producao=2))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+@pytest.fixture
+def cliente(app):
+    # Navegador já logado
+    c = app.test_client()
+    c.post('/login', data={'username': 'vanda', 'password': 'senha'})
+    return c
+
+@pytest.fixture
+def criar_pedido(cliente):
+    # Cria um pedido do Biquíni pela tela de novo pedido e devolve o id
+    def criar(quantidade=2):
+        itens = [{'id': 1, 'qty': quantidade, 'preco': 100, 'cor': 'Nude'}]
+        resposta = cliente.post('/pedidos/novo', data={'cliente_id': 1, 'forma_envio': 'Correios', 'itens_carrinho': json.dumps(itens)})
+        return int(resposta.headers['Location'].rsplit('/', 1)[1])
+    return criar
@@ -0,0 +1,21 @@
+from sqlalchemy import inspect
+from app import criar_app
+from extensoes import db
+
+def test_subir_o_app_nao_mexe_no_banco_e_init_db_cria_as_tabelas(tmp_path):
+    app = criar_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'novo.db')})
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+
+    resultado = app.test_cli_runner().invoke(args=['init-db'])
+    assert resultado.exit_code == 0
+    with app.app_context():
+        assert 'Pedidos' in inspect(db.engine).get_table_names()
+        db.engine.dispose()
+
+def test_rotas_ficam_nos_blueprints_com_as_mesmas_urls(app):
+    urls = {regra.rule: regra.endpoint for regra in app.url_map.iter_rules()}
+    assert urls['/login'] == 'auth.login'
+    assert urls['/clientes'] == 'clientes.clientes'
+    assert urls['/produtos'] == 'produtos.produtos'
+    assert urls['/pedidos'] == 'pedidos.pedidos'
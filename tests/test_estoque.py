@@ -0,0 +1,133 @@
+import json
+import pytest
+from extensoes import db
+from modelos import Pedido, Material, ItemReceita, Consumo
+from estoque import saldo_materiais, relatorio_falta
+
+@pytest.fixture
+def materiais(app):
+    # Biquíni (produto 1) leva 2m de cordão e 1 argola por peça
+    with app.app_context():
+        db.session.add_all([Material(nome='Cordão', unidade='m', estoque_atual=100),
+                            Material(nome='Argola', unidade='un', estoque_atual=10)])
+        db.session.flush()
+        db.session.add_all([ItemReceita(produto_id=1, material_id=1, quantidade=2),
+                            ItemReceita(produto_id=1, material_id=2, quantidade=1)])
+        db.session.commit()
+
+def mudar_status(app, pedido_id, status):
+    with app.app_context():
+        pedido = db.session.get(Pedido, pedido_id)
+        db.session.commit()  # Deixa o objeto expirado, como numa requisição depois de outro commit
+        pedido.status = status
+        db.session.commit()
+
+def saldo(app):
+    with app.app_context():
+        return {linha.nome: (linha.estoque_atual, linha.reservado) for linha in saldo_materiais()}
+
+def test_itens_reservam_e_envio_consome(app, cliente, materiais, criar_pedido):
+    pedido_id = criar_pedido(3)
+    assert saldo(app) == {'Cordão': (100, 6), 'Argola': (10, 3)}
+
+    # Edição do carrinho troca a reserva
+    cliente.post(f'/pedidos/novo?editar_id={pedido_id}', data={'pedido_id_editar': pedido_id, 'cliente_id': 1, 'forma_envio': 'Correios',
+                 'itens_carrinho': json.dumps([{'id': 1, 'qty': 1, 'preco': 100, 'cor': 'Rosa'}])})
+    assert saldo(app) == {'Cordão': (100, 2), 'Argola': (10, 1)}
+
+    mudar_status(app, pedido_id, 'Enviado')
+    assert saldo(app) == {'Cordão': (98, 0), 'Argola': (9, 0)}
+
+def test_desfazer_envio_devolve_o_que_foi_consumido_mesmo_com_receita_nova(app, materiais, criar_pedido):
+    pedido_id = criar_pedido(3)
+    mudar_status(app, pedido_id, 'Enviado')
+    with app.app_context():
+        ItemReceita.query.filter_by(material_id=1).first().quantidade = 5
+        db.session.commit()
+
+    mudar_status(app, pedido_id, 'Em Produção')
+    # Devolve os 6m que saíram e a reserva já usa a receita nova (3 x 5m)
+    assert saldo(app) == {'Cordão': (100, 15), 'Argola': (10, 3)}
+    with app.app_context():
+        assert Consumo.query.count() == 0
+
+def test_receita_mudada_depois_da_reserva_nao_desanda_a_conta(app, materiais, criar_pedido):
+    pedido_id = criar_pedido(3)
+    with app.app_context():
+        ItemReceita.query.filter_by(material_id=1).first().quantidade = 5
+        db.session.commit()
+    assert saldo(app)['Cordão'] == (100, 15)
+
+    mudar_status(app, pedido_id, 'Enviado')
+    assert saldo(app)['Cordão'] == (85, 0)
+
+def test_pedido_aberto_antes_da_receita_ja_entra_na_reserva(app, criar_pedido):
+    criar_pedido(4)
+    with app.app_context():
+        db.session.add(Material(nome='Cordão', unidade='m', estoque_atual=5))
+        db.session.flush()
+        db.session.add(ItemReceita(produto_id=1, material_id=1, quantidade=2))
+        db.session.commit()
+        linha = relatorio_falta()[0]
+        assert (linha.reservado, linha.falta) == (8, 3)
+
+def test_apagar_ou_cancelar_pedido_enviado_nao_devolve_material(app, cliente, materiais, criar_pedido):
+    enviado = criar_pedido(1)
+    cancelado = criar_pedido(1)
+    mudar_status(app, enviado, 'Enviado')
+    mudar_status(app, cancelado, 'Enviado')
+    assert saldo(app) == {'Cordão': (96, 0), 'Argola': (8, 0)}
+
+    cliente.post(f'/pedidos/deletar/{enviado}', data={'password': 'senha'})
+    mudar_status(app, cancelado, 'Cancelado')
+    assert saldo(app) == {'Cordão': (96, 0), 'Argola': (8, 0)}
+
+def test_cancelar_pedido_aberto_libera_a_reserva(app, materiais, criar_pedido):
+    pedido_id = criar_pedido(2)
+    mudar_status(app, pedido_id, 'Cancelado')
+    assert saldo(app) == {'Cordão': (100, 0), 'Argola': (10, 0)}
+
+def test_telas_de_estoque_abrem(cliente, materiais, criar_pedido):
+    criar_pedido(1)
+    assert cliente.get('/materiais').status_code == 200
+    assert cliente.get('/materiais/falta').status_code == 200
+    assert cliente.get('/produtos/receita/1').status_code == 200
+
+def test_concluido_com_ou_sem_acento_consome(app, materiais, criar_pedido):
+    sem_acento = criar_pedido(1)
+    com_acento = criar_pedido(1)
+    mudar_status(app, sem_acento, 'Concluido')
+    mudar_status(app, com_acento, 'Concluído')
+    assert saldo(app) == {'Cordão': (96, 0), 'Argola': (8, 0)}
+
+def test_enviado_cancelado_e_enviado_de_novo_so_consome_uma_vez(app, materiais, criar_pedido):
+    pedido_id = criar_pedido(1)
+    mudar_status(app, pedido_id, 'Enviado')
+    mudar_status(app, pedido_id, 'Cancelado')
+    mudar_status(app, pedido_id, 'Enviado')
+    assert saldo(app) == {'Cordão': (98, 0), 'Argola': (9, 0)}
+    with app.app_context():
+        assert Consumo.query.count() == 2
+
+def test_pedido_novo_com_id_de_pedido_apagado_nao_herda_consumo(app, cliente, materiais, criar_pedido):
+    apagado = criar_pedido(1)
+    mudar_status(app, apagado, 'Enviado')
+    cliente.post(f'/pedidos/deletar/{apagado}', data={'password': 'senha'})
+
+    novo = criar_pedido(1)
+    assert novo == apagado  # SQLite reaproveita o id
+    mudar_status(app, novo, 'Enviado')
+    assert saldo(app) == {'Cordão': (96, 0), 'Argola': (8, 0)}
+    with app.app_context():
+        assert Consumo.query.filter_by(pedido_id=None).count() == 2
+
+def test_mudar_itens_de_pedido_enviado_refaz_o_consumo(app, cliente, materiais, criar_pedido):
+    pedido_id = criar_pedido(3)
+    mudar_status(app, pedido_id, 'Enviado')
+    assert saldo(app) == {'Cordão': (94, 0), 'Argola': (7, 0)}
+
+    cliente.post(f'/pedidos/novo?editar_id={pedido_id}', data={'pedido_id_editar': pedido_id, 'cliente_id': 1, 'forma_envio': 'Correios',
+                 'itens_carrinho': json.dumps([{'id': 1, 'qty': 1, 'preco': 100, 'cor': 'Rosa'}])})
+    assert saldo(app) == {'Cordão': (98, 0), 'Argola': (9, 0)}
+    with app.app_context():
+        assert sorted(c.quantidade for c in Consumo.query.filter_by(pedido_id=pedido_id)) == [1, 2]
@@ -0,0 +1,71 @@
+import json
+from extensoes import db
+from modelos import Pagamento, Evento
+from eventos import ler_eventos
+
+def consumir_tudo(app, desde=0, lote=2):
+    # Consumidor local: lê em lotes até acabar, guardando o cursor
+    vistos = []
+    with app.app_context():
+        while True:
+            eventos, desde = ler_eventos(desde, lote)
+            vistos += [(e.tabela, e.operacao, json.loads(e.dados) if e.dados else None) for e in eventos]
+            if len(eventos) < lote:
+                return vistos, desde
+
+def test_consumidor_le_em_lotes_a_partir_do_cursor(app, cliente, criar_pedido):
+    pedido_id = criar_pedido()
+    cliente.post(f'/pedidos/salvar_pagamento/{pedido_id}', data={
+        'valor_desconto_final': '0', 'prazo_entrega': '2026-12-01', 'valor_pago': '50', 'metodo_pagamento': 'Pix',
+        'lista_taxas_json': json.dumps([{'tipo': 'Frete', 'valor': '20', 'status': 'Pendente'}])})
+
+    vistos, cursor = consumir_tudo(app)
+    assert [(t, o) for t, o, _ in vistos] == [
+        ('Pedidos', 'criado'), ('Itens_Pedido', 'criado'),
+        ('Pagamentos', 'criado'), ('Custos_Envio', 'criado'), ('Pedidos', 'alterado')]
+    # Alteração leva só os campos que mudaram
+    assert set(vistos[-1][2]) == {'status', 'prazo_entrega'}
+
+    # Do cursor pra frente só vem o que é novo
+    cliente.post(f'/pedidos/editar/{pedido_id}', data={'status': 'Em Produção', 'forma_envio': 'Correios', 'prazo_entrega': '2026-12-01'})
+    novos, novo_cursor = consumir_tudo(app, desde=cursor)
+    assert novos == [('Pedidos', 'alterado', {'status': 'Em Produção'})]
+    assert novo_cursor > cursor
+    assert consumir_tudo(app, desde=novo_cursor) == ([], novo_cursor)
+
+def test_rollback_nao_deixa_evento(app):
+    with app.app_context():
+        db.session.add(Pagamento(pedido_id=None, metodo='Pix', valor=10))
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+        assert Evento.query.count() == 0
+
+def test_apagar_pedido_gera_evento_e_endpoint_devolve_json(app, cliente, criar_pedido):
+    pedido_id = criar_pedido()
+    cliente.post(f'/pedidos/deletar/{pedido_id}', data={'password': 'senha'})
+
+    resposta = cliente.get('/eventos?desde=0&limite=10').get_json()
+    assert ('Pedidos', 'apagado') in [(e['tabela'], e['operacao']) for e in resposta['eventos']]
+    assert resposta['cursor'] == resposta['eventos'][-1]['id']
+
+def test_comando_consumidor_imprime_eventos_e_cursor(app, criar_pedido):
+    criar_pedido()
+    resultado = app.test_cli_runner().invoke(args=['consumir-eventos', '--desde', '0', '--lote', '1'])
+    linhas = [json.loads(linha) for linha in resultado.output.splitlines() if linha.startswith('{')]
+    assert [e['id'] for e in linhas] == [1, 2]
+    assert 'cursor=2' in resultado.output
+
+def test_ganchos_ficam_ativos_so_importando_os_modelos():
+    # Script que usa só extensoes/modelos (sem as rotas) também registra estoque, recibos e eventos
+    import os
+    import subprocess
+    import sys
+    codigo = ("import sys; from sqlalchemy import event; from extensoes import SessaoRoteada; import modelos; "
+              "assert 'rotas.pedidos' not in sys.modules; "
+              "assert event.contains(SessaoRoteada, 'after_flush', sys.modules['eventos'].registrar_eventos); "
+              "assert event.contains(SessaoRoteada, 'before_flush', sys.modules['estoque'].capturar_mudancas_status); "
+              "assert event.contains(SessaoRoteada, 'before_flush', sys.modules['recibos'].invalidar_recibos)")
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', codigo], cwd=raiz, check=True)
@@ -0,0 +1,102 @@
+import os
+from datetime import datetime
+from extensoes import db
+from modelos import Produto, Pedido, Recibo
+from recibos import garantir_linhas, renderizar_e_salvar, montar_dados_recibo, marcar_gerados, limpar_recibos_orfaos, pasta_recibos
+
+def abrir_recibo(cliente, pedido_id):
+    resposta = cliente.get(f'/pedidos/recibo/{pedido_id}')
+    return resposta.headers['Location']
+
+def test_recibo_e_reaproveitado_e_refeito_quando_o_pedido_muda(app, cliente, criar_pedido):
+    pedido_id = criar_pedido()
+    link = abrir_recibo(cliente, pedido_id)
+    assert abrir_recibo(cliente, pedido_id) == link
+
+    resposta = cliente.get(link)
+    assert resposta.status_code == 200
+    assert 'private' in resposta.headers['Cache-Control']
+    assert 'public' not in resposta.headers['Cache-Control']
+    resposta.close()
+
+    cliente.post(f'/pedidos/editar/{pedido_id}', data={'status': 'Em Produção', 'forma_envio': 'Correios', 'prazo_entrega': '2026-12-01'})
+    novo_link = abrir_recibo(cliente, pedido_id)
+    assert novo_link != link
+    # O recibo velho some do disco e o link antigo não abre mais
+    assert cliente.get(link).status_code == 404
+    with app.app_context():
+        assert not os.path.exists(os.path.join(pasta_recibos(), link.rsplit('/', 1)[1]))
+
+def test_recibo_renderizado_antes_de_uma_mudanca_nao_fica_marcado_como_atual(app, criar_pedido):
+    pedido_id = criar_pedido()
+    with app.app_context():
+        versao, _ = garantir_linhas([pedido_id])[pedido_id]
+        _, hash_velho = renderizar_e_salvar(montar_dados_recibo(db.session.get(Pedido, pedido_id)), pasta_recibos())
+
+        # Alguém muda o pedido enquanto o recibo era gerado
+        db.session.get(Pedido, pedido_id).status = 'Pago'
+        db.session.commit()
+
+        assert marcar_gerados([(pedido_id, versao, hash_velho)]) == 0
+        assert db.session.get(Recibo, pedido_id).hash_conteudo is None
+        assert not os.path.exists(os.path.join(pasta_recibos(), hash_velho + '.html'))
+
+def test_editar_cliente_ou_produto_refaz_o_recibo(app, cliente, criar_pedido):
+    pedido_id = criar_pedido()
+    link = abrir_recibo(cliente, pedido_id)
+    cliente.post('/clientes/editar/1', data={'nome': 'Cliente Teste', 'telefone': '83999999999', 'email': '',
+                                            'endereco': 'Rua Nova, 10', 'estado_uf': 'PB', 'loja': '', 'tipo_cliente': 'Varejo'})
+    link_cliente = abrir_recibo(cliente, pedido_id)
+    assert link_cliente != link
+    assert 'Rua Nova, 10' in cliente.get(link_cliente).get_data(as_text=True)
+
+    with app.app_context():
+        db.session.get(Produto, 1).nome_produto = 'Biquíni Lacinho'
+        db.session.commit()
+    link_produto = abrir_recibo(cliente, pedido_id)
+    assert link_produto != link_cliente
+    assert 'Biquíni Lacinho' in cliente.get(link_produto).get_data(as_text=True)
+
+def test_apagar_pedido_apaga_o_recibo(app, cliente, criar_pedido):
+    pedido_id = criar_pedido()
+    link = abrir_recibo(cliente, pedido_id)
+    cliente.post(f'/pedidos/deletar/{pedido_id}', data={'password': 'senha'})
+    assert cliente.get(link).status_code == 404
+    with app.app_context():
+        assert db.session.get(Recibo, pedido_id) is None
+        assert os.listdir(pasta_recibos()) == []
+
+def test_limpeza_apaga_so_arquivos_sem_pedido(app, cliente, criar_pedido):
+    pedido_id = criar_pedido()
+    link = abrir_recibo(cliente, pedido_id)
+    with app.app_context():
+        sobra = os.path.join(pasta_recibos(), 'f' * 64 + '.html')
+        open(sobra, 'w').close()
+        assert limpar_recibos_orfaos(idade_minima=0) == 1
+        assert not os.path.exists(sobra)
+    assert cliente.get(link).status_code == 200
+
+def test_recibo_que_nao_para_de_mudar_volta_pros_detalhes(app, cliente, monkeypatch, criar_pedido):
+    pedido_id = criar_pedido()
+    # Simula outro worker mudando o pedido toda vez que o recibo termina de renderizar
+    monkeypatch.setattr('recibos.marcar_gerados', lambda gerados: 0)
+    resposta = cliente.get(f'/pedidos/recibo/{pedido_id}')
+    assert resposta.headers['Location'].endswith(f'/pedidos/detalhes/{pedido_id}')
+
+def test_comando_gera_recibos_do_periodo_em_lote(app, criar_pedido):
+    pedido_ids = [criar_pedido() for _ in range(3)]
+    hoje = datetime.now().strftime('%Y-%m-%d')
+    comando = ['gerar-recibos', hoje, hoje, '--processos', '2']
+
+    resultado = app.test_cli_runner().invoke(args=comando)
+    assert resultado.exit_code == 0, resultado.output
+    assert '3 pedidos no período, 3 recibos gerados.' in resultado.output
+    with app.app_context():
+        recibos = Recibo.query.filter(Recibo.pedido_id.in_(pedido_ids)).all()
+        assert len(recibos) == 3 and all(r.hash_conteudo for r in recibos)
+        arquivos = {r.hash_conteudo + '.html' for r in recibos}
+        assert arquivos <= set(os.listdir(pasta_recibos()))
+
+    # Segunda vez: tudo já gerado, nada é refeito
+    resultado = app.test_cli_runner().invoke(args=comando)
+    assert '3 pedidos no período, 0 recibos gerados.' in resultado.output
@@ -0,0 +1,52 @@
+import time
+import shutil
+import pytest
+from app import criar_app
+from extensoes import db, estado_replica
+from modelos import Cliente
+
+@pytest.fixture
+def app_com_replica(tmp_path):
+    # Dois SQLite: um faz papel de principal e o outro de réplica (com as mesmas tabelas, mas vazio)
+    (tmp_path / 'replica').mkdir()
+    app = criar_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'principal.db'),
+        'SQLALCHEMY_BINDS': {'replica': 'sqlite:///' + str(tmp_path / 'replica' / 'replica.db')},
+        'REPLICA_ATRASO_MAXIMO': 5,
+    })
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        db.session.add(Cliente(nome='Só no principal', endereco='Rua A', telefone='1', estado_uf='PB', tipo_cliente='Varejo'))
+        db.session.commit()
+    estado_replica.update(checado_em=0.0, saudavel=False)
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def contar_clientes(app, somente_leitura, ultima_escrita=0):
+    with app.test_request_context('/'):
+        from flask import g, session
+        g.somente_leitura = somente_leitura
+        session['ultima_escrita'] = ultima_escrita
+        return Cliente.query.count()
+
+def test_leitura_vai_pra_replica_e_escrita_recente_fica_no_principal(app_com_replica):
+    assert contar_clientes(app_com_replica, somente_leitura=True) == 0
+    assert contar_clientes(app_com_replica, somente_leitura=False) == 1
+    # Quem gravou agora há pouco lê do principal
+    assert contar_clientes(app_com_replica, somente_leitura=True, ultima_escrita=time.time()) == 1
+
+def test_checagem_nao_guarda_resultado_por_mais_que_o_atraso_maximo(app_com_replica, tmp_path):
+    app_com_replica.config.update(REPLICA_ATRASO_MAXIMO=1, REPLICA_INTERVALO_CHECAGEM=10)
+    # Réplica sai do ar, mas a última medição (de 2s atrás) dizia que estava saudável
+    with app_com_replica.app_context():
+        db.engines['replica'].dispose()
+    shutil.rmtree(tmp_path / 'replica')
+    estado_replica.update(checado_em=time.time() - 2, saudavel=True)
+
+    # 2s é mais que o atraso máximo (1s): tem que medir de novo e cair pro principal
+    assert contar_clientes(app_com_replica, somente_leitura=True) == 1
+    assert estado_replica['saudavel'] is False